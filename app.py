@@ -2,20 +2,64 @@
 # Flask application for serving live mandi prices
 
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from flask_caching import Cache
+from flask_compress import Compress
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import orjson
+import heapq
+import math
 from datetime import datetime
 import logging
 from functools import wraps
+from dataclasses import dataclass, field
+from operator import attrgetter
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import time
 import os
+import re
+import threading
+import uuid
 from dotenv import load_dotenv
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes responses with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response without a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend communication
 
+# Compress JSON responses (Brotli when the client accepts it, else gzip)
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+# Pinned to the Flask-Compress defaults so an upgrade cannot change them:
+# Brotli quality 4 (used by most clients, since 'br' is preferred), gzip
+# level 6 for the rest, and no compression for small error bodies
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,41 +67,259 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env (project root)
 load_dotenv()
 
+# Response cache (in-process by default; set CACHE_TYPE for shared backends)
+# e.g. CACHE_TYPE=RedisCache with REDIS_URL=redis://localhost:6379/0 so that
+# all gunicorn workers share one copy of the data and one upstream refresh
+app.config.from_mapping(
+    CACHE_TYPE=os.getenv('CACHE_TYPE', 'SimpleCache'),
+    CACHE_DEFAULT_TIMEOUT=300,
+    # Upper bound on in-process entries; SimpleCache evicts expired and then
+    # oldest entries past this, so filter combinations cannot grow memory unbounded.
+    # Each filter combination stores a fresh entry, a :stale copy and briefly a
+    # refresh lock, so the default keeps about 500 combinations
+    CACHE_THRESHOLD=int(os.getenv('CACHE_THRESHOLD', '1500')),
+    CACHE_KEY_PREFIX='kisanmitra:',
+    CACHE_REDIS_URL=os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+)
+cache = Cache(app)
+
 # Configuration
 # Resource: Variety-wise Daily Market Prices Data of Commodity
 GOV_API_BASE_URL = 'https://api.data.gov.in/resource/35985678-0d79-46b4-9ed6-6f13308a1d24'
 # IMPORTANT: Set your personal API key in the environment variable DATA_GOV_API_KEY
 GOV_API_KEY = os.getenv('DATA_GOV_API_KEY', '').strip()
+# data.gov.in returns at most 1000 records per call
+GOV_API_MAX_RECORDS = 1000
+# Only request the columns process_price_data reads to keep payloads small
+GOV_API_FIELDS = 'State,District,Market,Commodity,Min_Price,Modal_Price,Arrival_Date'
+# requests applies a timeout to connecting and to each socket read, not to a
+# whole response, and failed attempts are retried. The budgets below are what
+# a well-behaved upstream needs; they are enforced as deadlines on the fan-out
+# and on each refresh so a slowly trickling response cannot outlast them.
+GOV_API_TIMEOUT = 30
+GOV_API_STATE_TIMEOUT = 15
+UPSTREAM_RETRIES = 2
+# Deadline for the concurrent per-state fan-out as a whole
+GOV_API_STATE_BUDGET = 2 * GOV_API_STATE_TIMEOUT * (1 + UPSTREAM_RETRIES) + 5
+# Deadline for one price refresh: the fan-out, then the single-call fallback
+GOV_API_FETCH_BUDGET = GOV_API_STATE_BUDGET + 2 * GOV_API_TIMEOUT * (1 + UPSTREAM_RETRIES) + 5
 
 # News API Configuration
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', '').strip()
 NEWS_API_URL = 'https://newsapi.org/v2/everything'
 
-# Cache for storing API responses (simple in-memory cache)
-price_cache = {
-    'data': None,
-    'timestamp': None,
-    'cache_duration': 300  # 5 minutes in seconds
-}
+# Reused HTTP session so upstream calls (data.gov.in and NewsAPI) share pooled
+# keep-alive connections and transient gateway errors are retried with backoff.
+# pool_maxsize covers the upstream thread pool plus concurrent request threads.
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    # Retry-After is ignored so a retry can never outlast GOV_API_FETCH_BUDGET
+    max_retries=Retry(total=UPSTREAM_RETRIES, backoff_factor=0.2, status_forcelist=[502, 503, 504], respect_retry_after_header=False)
+))
+
+@dataclass(slots=True)
+class PriceRecord:
+    """A processed mandi price (orjson serializes it like a dict)"""
+    name: str
+    price: float
+    state: str = ''
+    district: str = ''
+    market: str = ''
+    date: str = ''
+    # Lowercased copies for filtering, computed once per record; orjson skips
+    # underscore-prefixed fields so they never reach API responses
+    _name_lower: str = field(init=False, repr=False, compare=False)
+    _state_lower: str = field(init=False, repr=False, compare=False)
+    _district_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._name_lower = self.name.lower()
+        self._state_lower = self.state.lower()
+        self._district_lower = self.district.lower()
 
-news_cache = {
-    'data': None,
-    'timestamp': None,
-    'cache_duration': 1800  # 30 minutes in seconds
+@dataclass(slots=True)
+class NewsArticle:
+    """A processed news article (orjson serializes it like a dict)"""
+    id: int
+    title: str
+    excerpt: str
+    content: str
+    category: str
+    date: str
+    source: str
+    url: str
+    image: str = '📰'  # Default emoji
+
+# Shared worker pool for upstream requests that can run concurrently
+# (per-state fan-out); sized to match the connection pool
+upstream_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='upstream')
+# Price refreshes run here so they can be abandoned at GOV_API_FETCH_BUDGET.
+# A separate pool keeps refreshes from starving their own per-state fetches.
+refresh_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='refresh')
+
+# Price data is cached per filter combination
+PRICE_CACHE_DURATION = 300  # 5 minutes in seconds
+# Highest-priced records kept per filter combination
+PRICE_RESULT_LIMIT = 35
+# Only one worker refreshes a given entry; the others wait for its result.
+# Refreshes give up at GOV_API_FETCH_BUDGET, so the lock outlives any refresh
+REFRESH_LOCK_TIMEOUT = GOV_API_FETCH_BUDGET + 15
+# Waiters never fetch upstream themselves, so they only wait briefly before
+# serving fallback data; a refresher killed mid-fetch must not tie them up
+REFRESH_WAIT_TIMEOUT = 20
+# The dashboard entry is refreshed in the background ahead of its expiry
+PRICE_REFRESH_INTERVAL = 240  # 4 minutes in seconds
+
+# News is cached per category and limit
+NEWS_CACHE_DURATION = 1800  # 30 minutes in seconds
+# The default news feed is refreshed in the background ahead of its expiry
+NEWS_REFRESH_INTERVAL = 1500  # 25 minutes in seconds
+NEWS_DEFAULT_LIMIT = 20
+
+# Last successful responses are kept longer and served if the upstream API fails
+STALE_CACHE_DURATION = 3600  # 1 hour in seconds
+
+# X-Cache header value for each price data source
+X_CACHE_STATUS = {
+    'cache': 'HIT',
+    'government_api': 'MISS',
+    'stale_cache': 'STALE',
+    'fallback': 'FALLBACK'
 }
 
-def cache_response(data):
-    """Cache the API response with timestamp"""
-    price_cache['data'] = data
-    price_cache['timestamp'] = time.time()
+# With a shared backend every hit costs a round-trip and an unpickle, so each
+# worker also keeps recently used price entries in memory for a short while
+LOCAL_CACHE_DURATION = 30  # seconds
+LOCAL_CACHE_SIZE = 128
+SHARED_CACHE_TYPES = {'RedisCache', 'RedisSentinelCache', 'RedisClusterCache'}
+# CACHE_TYPE may also be a dotted import path to the backend class
+LOCAL_CACHE_ENABLED = app.config['CACHE_TYPE'].rsplit('.', 1)[-1] in SHARED_CACHE_TYPES
+local_price_cache = {}
+
+# Response timestamps only need to move once a second, so the formatted string
+# is reused instead of being rebuilt for every response
+_iso_now_cache = ['', 0.0]
+
+def iso_now():
+    """Return the current local time in ISO format, reformatted at most once a second"""
+    now = time.time()
+    if now - _iso_now_cache[1] >= 1.0:
+        # Swap both values in one slice assignment so readers never see a mix
+        _iso_now_cache[:] = [datetime.fromtimestamp(now).isoformat(), now]
+    return _iso_now_cache[0]
+
+def price_cache_key(state_filter, district_filter, commodity_filter):
+    """Build a stable cache key for a combination of price filters"""
+    return f"mandi:{state_filter}|{district_filter}|{commodity_filter}"
+
+def news_cache_key(category_filter, limit):
+    """Build a stable cache key for a news category and limit"""
+    return f"news:{category_filter}|{limit}"
 
-def is_cache_valid():
-    """Check if cached data is still valid"""
-    if price_cache['data'] is None or price_cache['timestamp'] is None:
-        return False
+def cache_with_stale_copy(cache_key, entry, timeout):
+    """Cache an entry, plus a longer-lived copy to fall back on if upstream fails"""
+    cache.set(cache_key, entry, timeout=timeout)
+    cache.set(f"{cache_key}:stale", entry, timeout=STALE_CACHE_DURATION)
+
+# Refreshes running in this process, so local waiters are woken as soon as the
+# refresh finishes instead of polling the shared cache
+refresh_events = {}
+refresh_events_lock = threading.Lock()
+
+def remember_price_entry(cache_key, entry):
+    """Keep a price cache entry in this worker until it or the local copy expires"""
+    if not LOCAL_CACHE_ENABLED:
+        return
+    if len(local_price_cache) >= LOCAL_CACHE_SIZE:
+        local_price_cache.clear()
+    expires_at = min(time.time() + LOCAL_CACHE_DURATION, entry['timestamp'] + PRICE_CACHE_DURATION)
+    local_price_cache[cache_key] = (expires_at, entry)
+
+def get_price_entry(cache_key):
+    """Read a price cache entry, trying this worker's local copy before the shared cache"""
+    local = local_price_cache.get(cache_key)
+    if local is not None and local[0] > time.time():
+        return local[1]
+    
+    entry = cache.get(cache_key)
+    if entry is not None:
+        remember_price_entry(cache_key, entry)
+    return entry
+
+def acquire_refresh_lock(cache_key):
+    """Try to become the single refresher for a cache entry (SETNX on Redis)
     
-    elapsed_time = time.time() - price_cache['timestamp']
-    return elapsed_time < price_cache['cache_duration']
+    Returns a token identifying this holder, or None if the lock is taken.
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(f"{cache_key}:refresh_lock", token, timeout=REFRESH_LOCK_TIMEOUT):
+        return None
+    with refresh_events_lock:
+        refresh_events[cache_key] = (token, threading.Event())
+    return token
+
+def release_refresh_lock(cache_key, token):
+    """Release the refresh lock taken by acquire_refresh_lock, if still held by token"""
+    lock_key = f"{cache_key}:refresh_lock"
+    # Never delete a lock that expired and was taken by another refresher
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+    with refresh_events_lock:
+        holder = refresh_events.get(cache_key)
+        if holder is None or holder[0] != token:
+            return
+        del refresh_events[cache_key]
+    holder[1].set()
+
+def wait_for_refresh(cache_key):
+    """Wait for another thread's or worker's refresh of a cache entry to land"""
+    with refresh_events_lock:
+        holder = refresh_events.get(cache_key)
+    if holder is not None:
+        holder[1].wait(REFRESH_WAIT_TIMEOUT)
+        return cache.get(cache_key)
+    
+    # The refresh is running in another worker
+    deadline = time.time() + REFRESH_WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(0.2)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # The refresher gave up without caching anything
+        if not cache.has(f"{cache_key}:refresh_lock"):
+            break
+    return None
+
+def fetch_state_records(state, records_per_state):
+    """Fetch a few records for one state, returning [] on any failure"""
+    try:
+        params = {
+            'api-key': GOV_API_KEY,
+            'format': 'json',
+            'fields': GOV_API_FIELDS,
+            'limit': records_per_state,
+            'offset': 0,
+            'filters[State]': state
+        }
+        
+        logger.info("Fetching data for state: %s", state)
+        response = http_session.get(GOV_API_BASE_URL, params=params, timeout=GOV_API_STATE_TIMEOUT)
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            if 'records' in data and data['records']:
+                logger.info("Fetched %d records from %s", len(data['records']), state)
+                return data['records']
+            else:
+                logger.warning("No records found for %s", state)
+        else:
+            logger.warning("Failed to fetch data for %s: HTTP %s", state, response.status_code)
+        
+    except Exception as e:
+        logger.warning("Failed to fetch data for %s: %s", state, e)
+    return []
 
 def fetch_diverse_data(limit=50):
     """Fetch diverse data from multiple states when no filters are applied"""
@@ -70,35 +332,19 @@ def fetch_diverse_data(limit=50):
         all_records = []
         records_per_state = max(5, limit // len(major_states))
         
-        for state in major_states:
-            try:
-                params = {
-                    'api-key': GOV_API_KEY,
-                    'format': 'json',
-                    'limit': records_per_state,
-                    'offset': 0,
-                    'filters[State]': state
-                }
-                
-                logger.info(f"Fetching data for state: {state}")
-                response = requests.get(GOV_API_BASE_URL, params=params, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'records' in data and data['records']:
-                        all_records.extend(data['records'])
-                        logger.info(f"Fetched {len(data['records'])} records from {state}")
-                    else:
-                        logger.warning(f"No records found for {state}")
-                else:
-                    logger.warning(f"Failed to fetch data for {state}: HTTP {response.status_code}")
-                
-            except Exception as e:
-                logger.warning(f"Failed to fetch data for {state}: {e}")
-                continue
+        # Query every state concurrently; results come back in state order.
+        # The deadline holds even if the pool is busy with other refreshes.
+        state_results = upstream_executor.map(
+            lambda state: fetch_state_records(state, records_per_state),
+            major_states,
+            timeout=GOV_API_STATE_BUDGET
+        )
+        for records in state_results:
+            all_records.extend(records)
         
         # Return combined data
         if all_records:
-            logger.info(f"Total diverse records collected: {len(all_records)}")
+            logger.info("Total diverse records collected: %d", len(all_records))
             return {'records': all_records[:limit]}
         else:
             logger.warning("No diverse data collected, falling back to single API call")
@@ -106,17 +352,31 @@ def fetch_diverse_data(limit=50):
             params = {
                 'api-key': GOV_API_KEY,
                 'format': 'json',
+                'fields': GOV_API_FIELDS,
                 'limit': limit,
                 'offset': 0
             }
-            response = requests.get(GOV_API_BASE_URL, params=params, timeout=30)
+            response = http_session.get(GOV_API_BASE_URL, params=params, timeout=GOV_API_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
             
     except Exception as e:
-        logger.error(f"Error fetching diverse data: {e}")
+        logger.error("Error fetching diverse data: %s", e)
         raise Exception(f"Failed to fetch diverse data: {str(e)}")
 
+def fetch_government_page(params, offset, page_limit, timeout=GOV_API_TIMEOUT):
+    """Fetch a single page of records from the Indian Government API"""
+    page_params = dict(params, limit=page_limit, offset=offset)
+    response = http_session.get(GOV_API_BASE_URL, params=page_params, timeout=timeout)
+    response.raise_for_status()
+    
+    data = orjson.loads(response.content)
+    # data.gov.in signals errors via keys
+    if isinstance(data, dict) and data.get('status') == 'error':
+        msg = data.get('message', 'Unknown API error')
+        raise Exception(f"Government API error: {msg}")
+    return data
+
 def fetch_from_government_api(state: str = '', district: str = '', commodity: str = '', limit: int = 35):
     """Fetch data from Indian Government API"""
     try:
@@ -128,93 +388,117 @@ def fetch_from_government_api(state: str = '', district: str = '', commodity: st
             return fetch_diverse_data(limit)
         
         # For filtered requests, use the requested limit
-        api_limit = max(1, min(limit, 1000))
+        api_limit = max(1, min(limit, GOV_API_MAX_RECORDS))
         
         params = {
             'api-key': GOV_API_KEY,
             'format': 'json',
-            'limit': api_limit,
-            'offset': 0
+            'fields': GOV_API_FIELDS
         }
         # Forward filters using data.gov.in expected format
         # Field names based on actual API schema: State, District, Commodity
         if commodity:
             params['filters[Commodity]'] = commodity
-            logger.info(f"Applied commodity filter: {commodity}")
+            logger.info("Applied commodity filter: %s", commodity)
         if state:
             params['filters[State]'] = state
-            logger.info(f"Applied state filter: {state}")
+            logger.info("Applied state filter: %s", state)
         if district:
             params['filters[District]'] = district
-            logger.info(f"Applied district filter: {district}")
+            logger.info("Applied district filter: %s", district)
         
-        logger.info(f"Fetching data from government API: {url}")
-        logger.info(f"API parameters: {params}")
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
+        logger.info("Fetching data from government API: %s", url)
+        if logger.isEnabledFor(logging.DEBUG):
+            # Never write the API key to the logs
+            logger.debug("API parameters: %s", {key: value for key, value in params.items() if key != 'api-key'})
+        
+        data = fetch_government_page(params, 0, api_limit)
         
-        data = response.json()
-        # data.gov.in signals errors via keys
-        if isinstance(data, dict) and data.get('status') == 'error':
-            msg = data.get('message', 'Unknown API error')
-            raise Exception(f"Government API error: {msg}")
-        logger.info(f"Successfully fetched {len(data.get('records', []))} records")
+        logger.info("Successfully fetched %d records", len(data.get('records', [])))
         return data
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching from government API: {str(e)}")
+        logger.error("Error fetching from government API: %s", e)
         raise Exception(f"Government API request failed: {str(e)}")
     except json.JSONDecodeError as e:
-        logger.error(f"Error parsing JSON response: {str(e)}")
+        logger.error("Error parsing JSON response: %s", e)
         raise Exception("Invalid JSON response from government API")
 
-def process_price_data(raw_data):
-    """Process raw API data into our format"""
+def fetch_prices_with_deadline(**filters):
+    """Fetch from the government API, giving up once GOV_API_FETCH_BUDGET has passed"""
+    future = refresh_executor.submit(fetch_from_government_api, **filters)
+    try:
+        return future.result(timeout=GOV_API_FETCH_BUDGET)
+    except FutureTimeoutError:
+        # The abandoned fetch finishes in the background; its result is dropped
+        raise Exception(f"Government API fetch did not finish within {GOV_API_FETCH_BUDGET}s")
+
+def process_price_data(raw_data, limit=None):
+    """Process raw API data into our format, keeping the `limit` highest prices"""
     if not raw_data or 'records' not in raw_data:
         return []
     
+    if limit is not None and limit <= 0:
+        return []
+    
     processed_prices = []
+    # With a limit, keep a bounded min-heap of (price, -position, entry) so that
+    # records priced out of the top `limit` never get a result dict built
+    top_prices = []
+    cutoff = None  # lowest price in top_prices once it holds `limit` entries
+    heappush, heapreplace = heapq.heappush, heapq.heapreplace
     
-    for record in raw_data['records']:
+    for position, record in enumerate(raw_data['records']):
         try:
+            get = record.get
             # Extract crop name and price using actual API field names
-            name = record.get('Commodity', 'Unknown')
+            name = get('Commodity') or 'Unknown'
+            # Reject on the name before doing any price parsing
+            if name == 'Unknown' or len(name) <= 2:
+                continue
             # Use Modal_Price as primary, fallback to Min_Price
-            price_str = record.get('Modal_Price') or record.get('Min_Price') or '0'
-            price = float(str(price_str).strip() or 0)
+            price_str = get('Modal_Price') or get('Min_Price') or '0'
+            try:
+                # float() already accepts numbers and padded numeric strings
+                price = float(price_str)
+            except ValueError:
+                price = float(str(price_str).strip() or 0)
             
-            # Filter valid entries
-            if name != 'Unknown' and price > 0 and len(name) > 2:
-                processed_prices.append({
-                    'name': name.strip(),
-                    'price': price,
-                    'state': record.get('State', ''),
-                    'district': record.get('District', ''),
-                    'market': record.get('Market', ''),
-                    'date': record.get('Arrival_Date', '')
-                })
+            # Filter valid entries; NaN and infinity would serialize as null
+            if not math.isfinite(price) or price <= 0 or (cutoff is not None and price <= cutoff):
+                continue
+            
+            # data.gov.in sends null for missing fields, so .get defaults are not enough
+            entry = PriceRecord(
+                name.strip(),
+                price,
+                get('State') or '',
+                get('District') or '',
+                get('Market') or '',
+                get('Arrival_Date') or ''
+            )
+            if limit is None:
+                processed_prices.append(entry)
+            elif len(top_prices) < limit:
+                heappush(top_prices, (price, -position, entry))
+                if len(top_prices) == limit:
+                    cutoff = top_prices[0][0]
+            else:
+                heapreplace(top_prices, (price, -position, entry))
+                cutoff = top_prices[0][0]
                 
         except (ValueError, TypeError) as e:
-            logger.warning(f"Skipping invalid record: {record}, Error: {str(e)}")
+            logger.warning("Skipping invalid record: %s, Error: %s", record, e)
             continue
     
+    # Highest price first; ties keep their upstream order
+    if limit is not None:
+        return [entry for _, _, entry in sorted(top_prices, reverse=True)]
+    
     # Sort by price for consistent ordering; do not slice here
-    processed_prices.sort(key=lambda x: x['price'], reverse=True)
+    processed_prices.sort(key=attrgetter('price'), reverse=True)
     return processed_prices
 
-def cache_news_response(data):
-    """Cache the news API response with timestamp"""
-    news_cache['data'] = data
-    news_cache['timestamp'] = time.time()
-
-def is_news_cache_valid():
-    """Check if cached news data is still valid"""
-    if news_cache['data'] is None or news_cache['timestamp'] is None:
-        return False
-    
-    elapsed_time = time.time() - news_cache['timestamp']
-    return elapsed_time < news_cache['cache_duration']
-
 def fetch_agricultural_news(category='all', limit=20):
     """Fetch agricultural news from NewsAPI"""
     try:
@@ -241,73 +525,83 @@ def fetch_agricultural_news(category='all', limit=20):
             'domains': 'timesofindia.indiatimes.com,indianexpress.com,thehindu.com,hindustantimes.com,economic times.com'
         }
         
-        logger.info(f"Fetching agricultural news from NewsAPI: {category}")
-        response = requests.get(NEWS_API_URL, params=params, timeout=30)
+        logger.info("Fetching agricultural news from NewsAPI: %s", category)
+        response = http_session.get(NEWS_API_URL, params=params, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
+        data = orjson.loads(response.content)
         if data.get('status') == 'error':
             raise Exception(f"NewsAPI error: {data.get('message', 'Unknown error')}")
         
-        logger.info(f"Successfully fetched {len(data.get('articles', []))} news articles")
+        logger.info("Successfully fetched %d news articles", len(data.get('articles', [])))
         return data
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching from NewsAPI: {str(e)}")
+        logger.error("Error fetching from NewsAPI: %s", e)
         raise Exception(f"NewsAPI request failed: {str(e)}")
     except json.JSONDecodeError as e:
-        logger.error(f"Error parsing NewsAPI JSON response: {str(e)}")
+        logger.error("Error parsing NewsAPI JSON response: %s", e)
         raise Exception("Invalid JSON response from NewsAPI")
 
+# Keyword patterns for categorizing news, checked in priority order. Each is a
+# single compiled alternation so an article is scanned once per category.
+NEWS_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(map(re.escape, words))))
+    for category, words in [
+        ('policy', ['policy', 'scheme', 'government', 'msp', 'pm-kisan']),
+        ('market', ['price', 'market', 'mandi', 'commodity']),
+        ('weather', ['weather', 'monsoon', 'rainfall', 'drought', 'flood']),
+        ('technology', ['technology', 'drone', 'ai', 'digital', 'smart'])
+    ]
+]
+
+def valid_news_articles(articles):
+    """Yield (title, description, article) for articles with a usable title and description"""
+    for article in articles:
+        # NewsAPI sends null for missing fields, so .get defaults are not enough
+        title = (article.get('title') or '').strip()
+        description = (article.get('description') or '').strip()
+        if len(title) > 10 and len(description) > 20:
+            yield title, description, article
+
 def process_news_data(raw_data):
     """Process raw news API data into our format"""
     if not raw_data or 'articles' not in raw_data:
         return []
     
     processed_news = []
+    today = datetime.now().strftime('%Y-%m-%d')
     
-    for article in raw_data['articles']:
+    for article_id, (title, description, article) in enumerate(valid_news_articles(raw_data['articles']), 1):
         try:
-            # Extract and clean data
-            title = article.get('title', '').strip()
-            description = article.get('description', '').strip()
             url = article.get('url', '')
             published_at = article.get('publishedAt', '')
-            source = article.get('source', {}).get('name', 'Unknown')
+            source = (article.get('source') or {}).get('name', 'Unknown')
             
             # Determine category based on content
             content_lower = (title + ' ' + description).lower()
-            if any(word in content_lower for word in ['policy', 'scheme', 'government', 'msp', 'pm-kisan']):
-                category = 'policy'
-            elif any(word in content_lower for word in ['price', 'market', 'mandi', 'commodity']):
-                category = 'market'
-            elif any(word in content_lower for word in ['weather', 'monsoon', 'rainfall', 'drought', 'flood']):
-                category = 'weather'
-            elif any(word in content_lower for word in ['technology', 'drone', 'ai', 'digital', 'smart']):
-                category = 'technology'
-            else:
-                category = 'market'  # default
+            category = next(
+                (name for name, pattern in NEWS_CATEGORY_PATTERNS if pattern.search(content_lower)),
+                'market'  # default
+            )
             
-            # Filter valid articles
-            if title and len(title) > 10 and description and len(description) > 20:
-                processed_news.append({
-                    'id': len(processed_news) + 1,
-                    'title': title,
-                    'excerpt': description[:200] + '...' if len(description) > 200 else description,
-                    'content': description,
-                    'category': category,
-                    'date': published_at[:10] if published_at else datetime.now().strftime('%Y-%m-%d'),
-                    'source': source,
-                    'url': url,
-                    'image': '📰'  # Default emoji
-                })
+            processed_news.append(NewsArticle(
+                id=article_id,
+                title=title,
+                excerpt=description[:200] + '...' if len(description) > 200 else description,
+                content=description,
+                category=category,
+                date=published_at[:10] if published_at else today,
+                source=source,
+                url=url
+            ))
                 
         except (ValueError, TypeError) as e:
-            logger.warning(f"Skipping invalid news article: {article}, Error: {str(e)}")
+            logger.warning("Skipping invalid news article: %s, Error: %s", article, e)
             continue
     
     # Sort by date (newest first)
-    processed_news.sort(key=lambda x: x['date'], reverse=True)
+    processed_news.sort(key=attrgetter('date'), reverse=True)
     return processed_news
 
 def get_fallback_news():
@@ -348,6 +642,19 @@ def get_fallback_news():
         }
     ]
 
+# Fallback news is static, so convert and group it by category once
+FALLBACK_NEWS = [NewsArticle(**article) for article in get_fallback_news()]
+FALLBACK_NEWS_BY_CATEGORY = {
+    category: [article for article in FALLBACK_NEWS if article.category == category]
+    for category in {article.category for article in FALLBACK_NEWS}
+}
+FALLBACK_NEWS_BY_CATEGORY['all'] = FALLBACK_NEWS
+# Pre-serialized article lists, embedded as-is when a response carries a whole category
+FALLBACK_NEWS_JSON = {
+    category: orjson.Fragment(orjson.dumps(articles))
+    for category, articles in FALLBACK_NEWS_BY_CATEGORY.items()
+}
+
 def get_fallback_data():
     """Return fallback data when API is unavailable"""
     return [
@@ -409,31 +716,167 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': iso_now(),
         'version': '1.0.0',
         'service': 'Kisan Mitra Mandi Prices API'
     })
 
-def apply_filters_to_data(data, state_filter, district_filter, commodity_filter):
-    """Apply filters to price data"""
+def build_filter_index(data):
+    """Index price records by lowercased state, district and commodity name"""
+    index = {'state': defaultdict(list), 'district': defaultdict(list), 'name': defaultdict(list)}
+    for position, item in enumerate(data):
+        index['state'][item._state_lower].append(position)
+        index['district'][item._district_lower].append(position)
+        index['name'][item._name_lower].append(position)
+    return {field_name: dict(positions) for field_name, positions in index.items()}
+
+# Fallback prices are static, so build them and their filter index once
+FALLBACK_PRICES = [PriceRecord(**item) for item in get_fallback_data()]
+FALLBACK_PRICE_INDEX = build_filter_index(FALLBACK_PRICES)
+
+def apply_filters_to_data(data, state_filter, district_filter, commodity_filter, index):
+    """Apply filters to price data using its prebuilt filter index"""
     if not data:
         return []
     
-    filtered_data = data
+    # Most requests (the dashboard) carry no filters at all
+    if not (state_filter or district_filter or commodity_filter):
+        return data
+    
+    postings = [
+        index[field_name].get(value.lower(), ())
+        for field_name, value in (('state', state_filter), ('district', district_filter), ('name', commodity_filter))
+        if value
+    ]
+    # Position lists are already in data order, so one filter needs no set
+    if len(postings) == 1:
+        return [data[position] for position in postings[0]]
+    
+    # Intersect starting from the most selective filter
+    postings.sort(key=len)
+    matches = set(postings[0])
+    for positions in postings[1:]:
+        if not matches:
+            break
+        matches.intersection_update(positions)
+    return [data[position] for position in sorted(matches)]
+
+def build_fallback_prices_json():
+    """Pre-serialize the fallback price lists for no filter and for each single state"""
+    states = [''] + list(FALLBACK_PRICE_INDEX['state'])
+    return {
+        state: orjson.dumps(
+            apply_filters_to_data(FALLBACK_PRICES, state, '', '', FALLBACK_PRICE_INDEX)[:PRICE_RESULT_LIMIT]
+        )
+        for state in states
+    }
+
+FALLBACK_PRICES_JSON = build_fallback_prices_json()
+
+def is_not_modified(etag, last_modified):
+    """Check conditional request headers against an ETag and a fetch time"""
+    # If-None-Match takes precedence; also accept Flask-Compress encoded variants
+    if request.if_none_match:
+        candidates = [etag] + [f"{etag}:{algorithm}" for algorithm in app.config['COMPRESS_ALGORITHM']]
+        return any(request.if_none_match.contains_weak(candidate) for candidate in candidates)
+    
+    # HTTP dates have one-second resolution, so compare whole seconds
+    if_modified_since = request.if_modified_since
+    return if_modified_since is not None and int(last_modified) <= if_modified_since.timestamp()
+
+def set_price_cache_headers(response, etag, last_modified, source):
+    """Set the validator, caching and X-Cache headers shared by 200 and 304 price responses"""
+    if etag:
+        response.set_etag(etag, weak=True)
+        response.last_modified = int(last_modified)
+        response.headers['Cache-Control'] = 'public, max-age=60'
+    response.headers['X-Cache'] = X_CACHE_STATUS[source]
+    return response
+
+def load_prices(state_filter='', district_filter='', commodity_filter='', force_refresh=False):
+    """Load prices for a filter combination from cache, government API or fallback data
+    
+    Returns a (prices, source, timestamp, message, prices_json) tuple, where
+    prices_json is the prices list already serialized, or None if it is not.
+    """
+    cache_key = price_cache_key(state_filter, district_filter, commodity_filter)
+    
+    # Check if we have valid cached data for this filter combination
+    cached = None if force_refresh else get_price_entry(cache_key)
+    refresh_token = None
+    if cached is None:
+        refresh_token = acquire_refresh_lock(cache_key)
+        if refresh_token is None:
+            # Another request is refreshing; answer from its last result if there is one
+            if cache.has(f"{cache_key}:stale"):
+                return load_stale_or_fallback_prices(cache_key, state_filter, district_filter, commodity_filter)
+            logger.info("Waiting for refresh in progress")
+            cached = wait_for_refresh(cache_key)
+            # The refresh failed or is still running; never add a second
+            # upstream request on top of it
+            if cached is None:
+                return load_stale_or_fallback_prices(cache_key, state_filter, district_filter, commodity_filter)
+    
+    if cached is not None:
+        logger.info("Returning cached data")
+        # Entries are keyed by their filters and hold rows data.gov.in already
+        # filtered, so they are served exactly as the fresh fetch returned them
+        timestamp = datetime.fromtimestamp(cached['timestamp']).isoformat()
+        return cached['data'], 'cache', timestamp, 'Data retrieved from cache', cached['json']
     
-    # Apply state filter
-    if state_filter:
-        filtered_data = [item for item in filtered_data if item.get('state', '').lower() == state_filter.lower()]
+    # Try to fetch fresh data from government API using query filters first
+    try:
+        raw_data = fetch_prices_with_deadline(
+            state=state_filter,
+            district=district_filter,
+            commodity=commodity_filter,
+            limit=PRICE_RESULT_LIMIT
+        )
+        processed_data = process_price_data(raw_data, limit=PRICE_RESULT_LIMIT)
+        
+        if processed_data:
+            fetched_at = time.time()
+            # Serialize once here so cache hits can send the stored bytes as-is
+            processed_json = orjson.dumps(processed_data)
+            entry = {
+                'data': processed_data,
+                'json': processed_json,
+                'timestamp': fetched_at
+            }
+            cache_with_stale_copy(cache_key, entry, PRICE_CACHE_DURATION)
+            remember_price_entry(cache_key, entry)
+            logger.info("Successfully processed %d price records", len(processed_data))
+            
+            # Already fetched with filters and capped at PRICE_RESULT_LIMIT
+            timestamp = datetime.fromtimestamp(fetched_at).isoformat()
+            return processed_data, 'government_api', timestamp, 'Live data fetched successfully', processed_json
+        else:
+            logger.warning("No valid data processed from government API")
+            
+    except Exception as api_error:
+        logger.error("Government API error: %s", api_error)
+    finally:
+        release_refresh_lock(cache_key, refresh_token)
     
-    # Apply district filter
-    if district_filter:
-        filtered_data = [item for item in filtered_data if item.get('district', '').lower() == district_filter.lower()]
+    return load_stale_or_fallback_prices(cache_key, state_filter, district_filter, commodity_filter)
+
+def load_stale_or_fallback_prices(cache_key, state_filter, district_filter, commodity_filter):
+    """Load prices from the stale copy of a cache entry, or else the fallback data"""
+    # Serve the last data fetched for these filters before resorting to samples
+    stale = cache.get(f"{cache_key}:stale")
+    if stale is not None:
+        logger.info("Using stale cached data")
+        timestamp = datetime.fromtimestamp(stale['timestamp']).isoformat()
+        return stale['data'], 'stale_cache', timestamp, 'Using last fetched data - Government API unavailable', stale['json']
     
-    # Apply commodity filter
-    if commodity_filter:
-        filtered_data = [item for item in filtered_data if item.get('name', '').lower() == commodity_filter.lower()]
+    # Fallback to sample data if API fails
+    logger.info("Using fallback data")
     
-    return filtered_data
+    # Apply filters to fallback data
+    filtered_fallback = apply_filters_to_data(FALLBACK_PRICES, state_filter, district_filter, commodity_filter, FALLBACK_PRICE_INDEX)[:PRICE_RESULT_LIMIT]
+    # Static fallback lists for no filter or a single state are pre-serialized
+    fallback_json = None if district_filter or commodity_filter else FALLBACK_PRICES_JSON.get(state_filter.lower())
+    return filtered_fallback, 'fallback', iso_now(), 'Using sample data - Government API unavailable', fallback_json
 
 @app.route('/api/mandi-prices', methods=['GET'])
 def get_mandi_prices():
@@ -444,84 +887,34 @@ def get_mandi_prices():
         district_filter = request.args.get('district', '').strip()
         commodity_filter = request.args.get('commodity', '').strip()
         force_refresh = request.args.get('force', '').lower() == 'true'
-        # Check if we have valid cached data
-        if is_cache_valid() and not force_refresh and not (state_filter or district_filter or commodity_filter):
-            logger.info("Returning cached data")
-            cached_data = price_cache['data']
-            
-            # Apply filters to cached data
-            filtered_data = apply_filters_to_data(cached_data, state_filter, district_filter, commodity_filter)
-
-            return jsonify({
-                'success': True,
-                'prices': filtered_data,
-                'source': 'cache',
-                'timestamp': datetime.fromtimestamp(price_cache['timestamp']).isoformat(),
-                'message': 'Data retrieved from cache',
-                'filters_applied': {
-                    'state': state_filter,
-                    'district': district_filter,
-                    'commodity': commodity_filter
-                }
-            })
-        
-        # Try to fetch fresh data from government API using query filters first
-        try:
-            raw_data = fetch_from_government_api(
-                state=state_filter,
-                district=district_filter,
-                commodity=commodity_filter,
-                limit=35
-            )
-            processed_data = process_price_data(raw_data)
-            
-            if processed_data:
-                cache_response(processed_data)
-                logger.info(f"Successfully processed {len(processed_data)} price records")
-                
-                # Already fetched with filters; keep only first 35 (safety)
-                filtered_data = processed_data[:35]
-                
-                return jsonify({
-                    'success': True,
-                    'prices': filtered_data,
-                    'source': 'government_api',
-                    'timestamp': datetime.now().isoformat(),
-                    'message': 'Live data fetched successfully',
-                    'filters_applied': {
-                        'state': state_filter,
-                        'district': district_filter,
-                        'commodity': commodity_filter
-                    }
-                })
-            else:
-                logger.warning("No valid data processed from government API")
-                
-        except Exception as api_error:
-            logger.error(f"Government API error: {str(api_error)}")
         
-        # Fallback to sample data if API fails
-        logger.info("Using fallback data")
-        fallback_data = get_fallback_data()
+        prices, source, timestamp, message, prices_json = load_prices(state_filter, district_filter, commodity_filter, force_refresh)
         
-        # Apply filters to fallback data
-        filtered_fallback = apply_filters_to_data(fallback_data, state_filter, district_filter, commodity_filter)[:35]
+        # Live and cached data only change when refetched, so clients can
+        # revalidate against the fetch time (ETag or Last-Modified) instead of
+        # re-downloading
+        etag = timestamp if source != 'fallback' else None
+        last_modified = datetime.fromisoformat(timestamp).timestamp() if etag else None
+        if etag and is_not_modified(etag, last_modified):
+            return set_price_cache_headers(app.response_class(status=304), etag, last_modified, source)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'prices': filtered_fallback,
-            'source': 'fallback',
-            'timestamp': datetime.now().isoformat(),
-            'message': 'Using sample data - Government API unavailable',
+            # Embed already-serialized prices instead of encoding them again
+            'prices': orjson.Fragment(prices_json) if prices_json is not None else prices,
+            'source': source,
+            'timestamp': timestamp,
+            'message': message,
             'filters_applied': {
                 'state': state_filter,
                 'district': district_filter,
                 'commodity': commodity_filter
             }
         })
+        return set_price_cache_headers(response, etag, last_modified, source)
         
     except Exception as e:
-        logger.error(f"Unexpected error in get_mandi_prices: {str(e)}")
+        logger.error("Unexpected error in get_mandi_prices: %s", e)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -532,16 +925,18 @@ def get_mandi_prices():
 def get_crop_price(crop_name):
     """Get specific crop price"""
     try:
-        # Get all prices first
-        response = get_mandi_prices()
-        data = response.get_json()
-        
-        if not data['success']:
-            return jsonify(data), 500
+        # Get all prices first (honouring the same query filters as /api/mandi-prices)
+        prices, _, timestamp, _, _ = load_prices(
+            request.args.get('state', '').strip(),
+            request.args.get('district', '').strip(),
+            request.args.get('commodity', '').strip(),
+            request.args.get('force', '').lower() == 'true'
+        )
         
         # Filter for specific crop
-        crop_prices = [price for price in data['prices'] 
-                      if crop_name.lower() in price['name'].lower()]
+        crop_lower = crop_name.lower()
+        crop_prices = [price for price in prices 
+                      if crop_lower in price._name_lower]
         
         if not crop_prices:
             return jsonify({
@@ -553,42 +948,48 @@ def get_crop_price(crop_name):
             'success': True,
             'crop': crop_name,
             'prices': crop_prices,
-            'timestamp': data['timestamp']
+            'timestamp': timestamp
         })
         
     except Exception as e:
-        logger.error(f"Error getting crop price for {crop_name}: {str(e)}")
+        logger.error("Error getting crop price for %s: %s", crop_name, e)
         return jsonify({
             'success': False,
             'error': str(e),
             'message': 'Internal server error'
         }), 500
 
+def load_news(category_filter='all', limit=NEWS_DEFAULT_LIMIT):
+    """Fetch news for a category from NewsAPI and cache the processed articles"""
+    raw_data = fetch_agricultural_news(category=category_filter, limit=limit)
+    processed_data = process_news_data(raw_data)
+    
+    if processed_data:
+        cache_with_stale_copy(news_cache_key(category_filter, limit), {'data': processed_data, 'timestamp': time.time()}, NEWS_CACHE_DURATION)
+        logger.info("Successfully processed %d news articles", len(processed_data))
+    return processed_data
+
 @app.route('/api/news', methods=['GET'])
 def get_agricultural_news():
     """Get agricultural news with optional filtering"""
     try:
         # Get filter parameters from query string
         category_filter = request.args.get('category', 'all').strip()
-        limit = int(request.args.get('limit', 20))
+        limit = int(request.args.get('limit', NEWS_DEFAULT_LIMIT))
         force_refresh = request.args.get('force', '').lower() == 'true'
         
-        # Check if we have valid cached data
-        if is_news_cache_valid() and not force_refresh and category_filter == 'all':
+        cache_key = news_cache_key(category_filter, limit)
+        
+        # Check if we have valid cached data for this category and limit
+        cached = None if force_refresh else cache.get(cache_key)
+        if cached is not None:
             logger.info("Returning cached news data")
-            cached_data = news_cache['data']
-            
-            # Apply category filter to cached data
-            if category_filter != 'all':
-                filtered_data = [article for article in cached_data if article.get('category') == category_filter]
-            else:
-                filtered_data = cached_data
             
             return jsonify({
                 'success': True,
-                'news': filtered_data[:limit],
+                'news': cached['data'][:limit],
                 'source': 'cache',
-                'timestamp': datetime.fromtimestamp(news_cache['timestamp']).isoformat(),
+                'timestamp': datetime.fromtimestamp(cached['timestamp']).isoformat(),
                 'message': 'News data retrieved from cache',
                 'filters_applied': {
                     'category': category_filter,
@@ -598,18 +999,14 @@ def get_agricultural_news():
         
         # Try to fetch fresh data from NewsAPI
         try:
-            raw_data = fetch_agricultural_news(category=category_filter, limit=limit)
-            processed_data = process_news_data(raw_data)
+            processed_data = load_news(category_filter, limit)
             
             if processed_data:
-                cache_news_response(processed_data)
-                logger.info(f"Successfully processed {len(processed_data)} news articles")
-                
                 return jsonify({
                     'success': True,
                     'news': processed_data[:limit],
                     'source': 'newsapi',
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': iso_now(),
                     'message': 'Live news data fetched successfully',
                     'filters_applied': {
                         'category': category_filter,
@@ -620,23 +1017,38 @@ def get_agricultural_news():
                 logger.warning("No valid news articles processed from NewsAPI")
                 
         except Exception as api_error:
-            logger.error(f"NewsAPI error: {str(api_error)}")
+            logger.error("NewsAPI error: %s", api_error)
+        
+        # Serve the last news fetched for this category before resorting to samples
+        stale = cache.get(f"{cache_key}:stale")
+        if stale is not None:
+            logger.info("Using stale cached news data")
+            return jsonify({
+                'success': True,
+                'news': stale['data'][:limit],
+                'source': 'stale_cache',
+                'timestamp': datetime.fromtimestamp(stale['timestamp']).isoformat(),
+                'message': 'Using last fetched news - NewsAPI unavailable',
+                'filters_applied': {
+                    'category': category_filter,
+                    'limit': limit
+                }
+            })
         
         # Fallback to sample data if API fails
         logger.info("Using fallback news data")
-        fallback_data = get_fallback_news()
-        
         # Apply category filter to fallback data
-        if category_filter != 'all':
-            filtered_fallback = [article for article in fallback_data if article.get('category') == category_filter]
+        filtered_fallback = FALLBACK_NEWS_BY_CATEGORY.get(category_filter, [])
+        if filtered_fallback and limit >= len(filtered_fallback):
+            news = FALLBACK_NEWS_JSON[category_filter]
         else:
-            filtered_fallback = fallback_data
+            news = filtered_fallback[:limit]
         
         return jsonify({
             'success': True,
-            'news': filtered_fallback[:limit],
+            'news': news,
             'source': 'fallback',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': iso_now(),
             'message': 'Using sample news data - NewsAPI unavailable',
             'filters_applied': {
                 'category': category_filter,
@@ -645,7 +1057,7 @@ def get_agricultural_news():
         })
         
     except Exception as e:
-        logger.error(f"Unexpected error in get_agricultural_news: {str(e)}")
+        logger.error("Unexpected error in get_agricultural_news: %s", e)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -656,15 +1068,18 @@ def get_agricultural_news():
 def get_api_stats():
     """Get API statistics"""
     try:
+        # Report on the unfiltered dashboard entry
+        cached = cache.get(price_cache_key('', '', ''))
         cache_info = {
-            'has_cached_data': price_cache['data'] is not None,
-            'cache_timestamp': price_cache['timestamp'],
-            'cache_valid': is_cache_valid(),
-            'cache_duration': price_cache['cache_duration']
+            'has_cached_data': cached is not None,
+            'cache_timestamp': cached['timestamp'] if cached else None,
+            'cache_valid': cached is not None,
+            'cache_duration': PRICE_CACHE_DURATION,
+            'cache_type': app.config['CACHE_TYPE']
         }
         
         if cache_info['has_cached_data']:
-            cache_info['data_count'] = len(price_cache['data'])
+            cache_info['data_count'] = len(cached['data'])
         
         return jsonify({
             'success': True,
@@ -675,47 +1090,86 @@ def get_api_stats():
                 'crop_price': '/api/mandi-prices/<crop_name>',
                 'stats': '/api/stats'
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         })
         
     except Exception as e:
-        logger.error(f"Error getting API stats: {str(e)}")
+        logger.error("Error getting API stats: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def refresh_periodically(name, interval, refresh):
+    """Keep a default cache entry warm so requests never wait on upstream"""
+    while True:
+        # Only one worker per interval refreshes when the cache is shared
+        if cache.add(f"{name}:refresh_schedule", 1, timeout=interval - 10):
+            try:
+                logger.info("Refreshing %s in the background", name)
+                refresh()
+            except Exception as e:
+                logger.error("Background %s refresh failed: %s", name, e)
+        time.sleep(interval)
+
+def start_background_refresh():
+    """Start background refresh threads for the upstream APIs that are configured"""
+    jobs = []
+    if GOV_API_KEY:
+        jobs.append(('mandi', PRICE_REFRESH_INTERVAL, lambda: load_prices(force_refresh=True)))
+    if NEWS_API_KEY:
+        jobs.append(('news', NEWS_REFRESH_INTERVAL, load_news))
+    
+    threads = []
+    for name, interval, refresh in jobs:
+        thread = threading.Thread(target=refresh_periodically, args=(name, interval, refresh), name=f"{name}-refresh", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+# Error bodies never change, so they are serialized once
+NOT_FOUND_JSON = orjson.dumps({
+    'success': False,
+    'error': 'Endpoint not found',
+    'message': 'The requested API endpoint does not exist'
+})
+INTERNAL_ERROR_JSON = orjson.dumps({
+    'success': False,
+    'error': 'Internal server error',
+    'message': 'An unexpected error occurred'
+})
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
-        'success': False,
-        'error': 'Endpoint not found',
-        'message': 'The requested API endpoint does not exist'
-    }), 404
+    return app.response_class(NOT_FOUND_JSON, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error',
-        'message': 'An unexpected error occurred'
-    }), 500
+    return app.response_class(INTERNAL_ERROR_JSON, status=500, mimetype='application/json')
+
+# Set BACKGROUND_REFRESH=0 to only refresh prices and news on request
+if os.getenv('BACKGROUND_REFRESH', '1') != '0':
+    start_background_refresh()
 
 if __name__ == '__main__':
-    logger.info("Starting Kisan Mitra Mandi Prices API Server...")
-    logger.info("Available endpoints:")
-    logger.info("  GET /api/health - Health check")
-    logger.info("  GET /api/mandi-prices - Get all mandi prices")
-    logger.info("  GET /api/mandi-prices/<crop> - Get specific crop price")
-    logger.info("  GET /api/news - Get agricultural news")
-    logger.info("  GET /api/stats - Get API statistics")
+    logger.info("\n".join([
+        "Starting Kisan Mitra Mandi Prices API Server...",
+        "Available endpoints:",
+        "  GET /api/health - Health check",
+        "  GET /api/mandi-prices - Get all mandi prices",
+        "  GET /api/mandi-prices/<crop> - Get specific crop price",
+        "  GET /api/news - Get agricultural news",
+        "  GET /api/stats - Get API statistics"
+    ]))
     
-    # Run the Flask app
+    # Run the Flask app; set FLASK_DEBUG=1 for the debugger and auto-reload
+    debug = os.getenv('FLASK_DEBUG') == '1'
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True,  # Set to False in production
-        threaded=True
+        debug=debug,
+        threaded=True,
+        use_reloader=debug
     )
@@ -0,0 +1,27 @@
+# Kisan Mitra - Gunicorn configuration
+# Picked up automatically when running `gunicorn app:app` from the project root
+
+import multiprocessing
+import os
+from dotenv import load_dotenv
+
+# Read the same .env as app.py so CACHE_TYPE set there is seen here too
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers: requests waiting on data.gov.in / NewsAPI block only their
+# own thread, not the whole worker
+worker_class = 'gthread'
+# With a shared Redis cache, use the usual 2 * CPUs + 1 workers. The in-process
+# cache is per worker, so keep to two there to avoid multiplying upstream calls.
+if os.getenv('CACHE_TYPE') == 'RedisCache':
+    default_workers = multiprocessing.cpu_count() * 2 + 1
+else:
+    default_workers = 2
+workers = int(os.getenv('GUNICORN_WORKERS', default_workers))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Upstream calls time out at 30 s, so leave room before killing a worker
+timeout = 60
+keepalive = 5
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Keep the background refresh threads from starting on import
+os.environ['BACKGROUND_REFRESH'] = '0'
+
+import app
+
+
+class ProcessPriceDataTest(unittest.TestCase):
+    def test_null_fields_keep_the_record(self):
+        raw_data = {'records': [
+            {'Commodity': 'Rice', 'Modal_Price': '2100', 'State': None, 'District': None, 'Market': None, 'Arrival_Date': None},
+            {'Commodity': 'Wheat', 'Modal_Price': '2000', 'State': 'Punjab', 'District': 'Amritsar'}
+        ]}
+
+        prices = app.process_price_data(raw_data, limit=app.PRICE_RESULT_LIMIT)
+
+        self.assertEqual([price.name for price in prices], ['Rice', 'Wheat'])
+        self.assertEqual((prices[0].state, prices[0].district, prices[0].market, prices[0].date), ('', '', '', ''))
+        index = app.build_filter_index(prices)
+        self.assertEqual(app.apply_filters_to_data(prices, 'punjab', '', '', index), [prices[1]])
+
+
+
+class LoadPricesTest(unittest.TestCase):
+    def setUp(self):
+        app.cache.clear()
+
+    def test_failed_refresh_is_not_retried_by_waiting_requests(self):
+        calls = []
+
+        def failing_fetch(**kwargs):
+            calls.append(kwargs)
+            time.sleep(0.2)
+            raise Exception('Government API down')
+
+        results = []
+        with mock.patch.object(app, 'fetch_from_government_api', failing_fetch):
+            threads = [
+                threading.Thread(target=lambda: results.append(app.load_prices('Punjab')[1]))
+                for _ in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['fallback'] * 6)
+
+    def test_waiting_request_serves_stale_copy_without_blocking(self):
+        raw_data = {'records': [{'Commodity': 'Rice', 'Modal_Price': '2100', 'State': 'Punjab'}]}
+        with mock.patch.object(app, 'fetch_from_government_api', return_value=raw_data):
+            app.load_prices('Punjab')
+        cache_key = app.price_cache_key('Punjab', '', '')
+        app.cache.delete(cache_key)
+        app.local_price_cache.clear()
+
+        # Another worker holds the refresh lock
+        app.cache.add(f"{cache_key}:refresh_lock", 'other-worker')
+        started = time.time()
+        with mock.patch.object(app, 'fetch_from_government_api') as fetch:
+            prices, source = app.load_prices('Punjab')[:2]
+
+        fetch.assert_not_called()
+        self.assertEqual(source, 'stale_cache')
+        self.assertEqual([price.name for price in prices], ['Rice'])
+        self.assertLess(time.time() - started, 1)
+
+    def test_cache_hit_returns_the_same_rows_as_the_fresh_fetch(self):
+        # data.gov.in filters upstream and can return values with stray whitespace
+        raw_data = {'records': [{'Commodity': 'Rice', 'Modal_Price': '2100', 'State': 'Punjab '}]}
+
+        with mock.patch.object(app, 'fetch_from_government_api', return_value=raw_data):
+            fresh, fresh_source = app.load_prices('Punjab')[:2]
+            cached, cached_source = app.load_prices('Punjab')[:2]
+
+        self.assertEqual((fresh_source, cached_source), ('government_api', 'cache'))
+        self.assertEqual(cached, fresh)
+        self.assertEqual(len(cached), 1)
+
+
+class MandiPricesEndpointTest(unittest.TestCase):
+    def setUp(self):
+        app.cache.clear()
+        app.local_price_cache.clear()
+        self.client = app.app.test_client()
+
+    def test_not_modified_response_keeps_caching_headers(self):
+        raw_data = {'records': [{'Commodity': 'Rice', 'Modal_Price': '2100', 'State': 'Punjab'}]}
+        with mock.patch.object(app, 'fetch_from_government_api', return_value=raw_data):
+            first = self.client.get('/api/mandi-prices?state=Punjab')
+            revalidated = self.client.get('/api/mandi-prices?state=Punjab',
+                                          headers={'If-None-Match': first.headers['ETag']})
+
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(revalidated.headers['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(revalidated.headers['X-Cache'], 'HIT')
+
+
+if __name__ == '__main__':
+    unittest.main()